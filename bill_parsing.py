@@ -0,0 +1,102 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# ==============================
+# REGEX PATTERNS
+# ==============================
+
+# One alternation for every labelled field and the subtotal; the match kind
+# is read back from m.lastgroup, so the text is scanned once. Text labels
+# match only the label itself: their value is cut from the text up to the
+# next match or the end of the line, so a value never hides a label that
+# follows it
+BILL_RE = re.compile(
+    r"(?P<patient_name>Patient Name)[:\-][ \t]*"
+    r"|(?P<hospital_name>Hospital Name)[:\-][ \t]*"
+    r"|(?P<date>Date)[:\-][ \t]*"
+    r"|GST[:\-]?\s*(?P<gst>\d+\.?\d*)"
+    r"|Sub Total[:\-]?\s*(?P<subtotal>\d+\.?\d*)"
+)
+# Billed items get their own pass: a line such as "18 GST 90" is both an item
+# and the GST, and one non-overlapping scan could only report one of them.
+# Items are kept to a single line so they cannot swallow the next label.
+# Whitespace and name words never overlap, and a digit run is only tried from
+# its first digit, so a failed match cannot retry every split of a long run
+# of spaces or digits
+ITEM_RE = re.compile(r"(?<!\d)\d+[ \t]+[A-Za-z]+(?:[ \t]+[A-Za-z]+)*[ \t]+\d+\.?\d*")
+# Each total label has its own group, named in TOTAL_LABELS from the highest
+# to the lowest priority. There is no \b before "total" so merged OCR tokens
+# such as "GrandTotal" or "NetTotal" still match; "grand" and "net" must not
+# be the tail of a longer word
+TOTAL_LABELS = ("grand", "net", "amount", "total")
+TOTAL_RE = re.compile(
+    r"(?i)(?:(?<![a-z])(?P<grand>grand\s*total)|(?<![a-z])(?P<net>net\s*total)"
+    r"|(?P<amount>total\s+amount)|(?P<total>total))"
+    r"\s*(?:[:\-]\s*)?(?P<value>\d+\.?\d*)"
+)
+# Only the bottom few lines carrying a total are ranked
+TOTAL_LINES = 3
+# A "Total" preceded by "Sub" and any punctuation or spacing ("Sub Total",
+# "Sub  Total", "Sub. Total", "Sub-Total") is a subtotal, not the bill total
+SUB_PREFIX_RE = re.compile(r"(?i)\bsub\W*$")
+
+TEXT_FIELDS = ("patient_name", "hospital_name", "date")
+
+# ==============================
+# DATA EXTRACTION
+# ==============================
+
+def extract_total(text: str) -> float:
+    # Totals sit at the bottom of a bill: scan upwards over the last
+    # TOTAL_LINES lines with a total and keep the best-ranked label; on a tie
+    # the lowest, rightmost candidate wins
+    best_rank = len(TOTAL_LABELS)
+    best_value = 0
+    lines_seen = 0
+    for line in reversed(text.splitlines()):
+        found = False
+        for total in reversed(list(TOTAL_RE.finditer(line))):
+            if SUB_PREFIX_RE.search(line, 0, total.start()):
+                continue
+            found = True
+            rank = next(index for index, label in enumerate(TOTAL_LABELS) if total.group(label))
+            if rank < best_rank:
+                best_rank = rank
+                best_value = float(total.group("value"))
+        if found:
+            lines_seen += 1
+            if best_rank == 0 or lines_seen == TOTAL_LINES:
+                break
+    return best_value
+
+def label_value(text: str, start: int, next_match: Optional[re.Match]) -> str:
+    end = text.find("\n", start)
+    if end == -1:
+        end = len(text)
+    if next_match is not None and next_match.start() < end:
+        end = next_match.start()
+    return text[start:end].rstrip()
+
+def parse_bill(text: str) -> Tuple[Dict, Optional[float], List[str]]:
+    found = {}
+    matches = list(BILL_RE.finditer(text))
+    for index, match in enumerate(matches):
+        field = match.lastgroup
+        if field not in found:
+            if field in TEXT_FIELDS:
+                next_match = matches[index + 1] if index + 1 < len(matches) else None
+                found[field] = label_value(text, match.end(), next_match)
+            else:
+                found[field] = match.group(field)
+
+    details = {
+        "patient_name": found.get("patient_name", "Not Found"),
+        "hospital_name": found.get("hospital_name", "Not Found"),
+        "date": found.get("date", "Not Found"),
+        "gst": float(found["gst"]) if "gst" in found else 0,
+        "total": extract_total(text)
+    }
+    subtotal = float(found["subtotal"]) if "subtotal" in found else None
+    items = ITEM_RE.findall(text)
+
+    return details, subtotal, items
@@ -1,11 +1,18 @@
 import streamlit as st
 import os
-import tempfile
-import re
-from typing import Dict
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from PIL import Image
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_bytes
+from bill_parsing import extract_total, parse_bill
+
+# PDF pages are OCR'd by one tesseract process per CPU; each process must stay
+# single-threaded, or their OpenMP pools oversubscribe the CPU. tesseract
+# inherits this environment, and a value set by the deployment wins
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+CPU_COUNT = os.cpu_count() or 1
 
 # ==============================
 # PAGE CONFIG
@@ -20,41 +27,40 @@ st.write("Real-Time Hospital Bill OCR & Validation System")
 # OCR FUNCTIONS (Backend Logic)
 # ==============================
 
-def extract_text_from_image(image_path):
-    img = Image.open(image_path)
+def extract_text_from_image(data: bytes):
+    img = Image.open(io.BytesIO(data))
     return pytesseract.image_to_string(img)
 
-def extract_text_from_pdf(pdf_path):
-    pages = convert_from_path(pdf_path)
-    text = ""
-    for page in pages:
-        text += pytesseract.image_to_string(page)
-    return text
-
-# ==============================
-# DATA EXTRACTION
-# ==============================
-
-def extract_key_details(text: str) -> Dict:
-    patient = re.search(r"Patient Name[:\-]\s*(.*)", text)
-    hospital = re.search(r"Hospital Name[:\-]\s*(.*)", text)
-    date = re.search(r"Date[:\-]\s*(.*)", text)
-    gst = re.search(r"GST[:\-]?\s*(\d+\.?\d*)", text)
-    total = re.search(r"Total[:\-]?\s*(\d+\.?\d*)", text)
-
-    return {
-        "patient_name": patient.group(1) if patient else "Not Found",
-        "hospital_name": hospital.group(1) if hospital else "Not Found",
-        "date": date.group(1) if date else "Not Found",
-        "gst": float(gst.group(1)) if gst else 0,
-        "total": float(total.group(1)) if total else 0
-    }
+def extract_text_from_pdf(data: bytes):
+    # Poppler renders pages on several threads; pages stay lossless PPM,
+    # streamed back over stdout rather than written to a temp folder
+    pages = convert_from_bytes(data, dpi=200, thread_count=CPU_COUNT)
+    # Each page is OCR'd by its own tesseract process, so threads are enough
+    # to run pages in parallel without pickling page images to workers
+    with ThreadPoolExecutor(max_workers=min(CPU_COUNT, len(pages) or 1)) as executor:
+        return "".join(executor.map(pytesseract.image_to_string, pages))
+
+# Streamlit reruns the script on every interaction; keyed on the uploaded
+# bytes, a bill is only OCR'd once
+@st.cache_data(show_spinner=False)
+def extract_text(data: bytes, is_pdf: bool) -> str:
+    if is_pdf:
+        return extract_text_from_pdf(data)
+    return extract_text_from_image(data)
 
 # ==============================
 # VALIDATION ENGINE
 # ==============================
 
-def validate_bill(data: Dict, text: str):
+def has_duplicates(items: List[str]) -> bool:
+    seen = set()
+    for item in items:
+        if item in seen:
+            return True
+        seen.add(item)
+    return False
+
+def validate_bill(data: Dict, subtotal: Optional[float], items: List[str]):
     errors = []
     fraud_score = 0
 
@@ -65,17 +71,14 @@ def validate_bill(data: Dict, text: str):
             fraud_score += 20
 
     # GST validation (18%)
-    amount_match = re.search(r"Sub Total[:\-]?\s*(\d+\.?\d*)", text)
-    if amount_match:
-        subtotal = float(amount_match.group(1))
+    if subtotal is not None:
         expected_gst = subtotal * 0.18
         if abs(expected_gst - data["gst"]) > 5:
             errors.append("GST calculation mismatch")
             fraud_score += 30
 
     # Duplicate items detection
-    items = re.findall(r"\d+\s+[A-Za-z ]+\s+\d+\.?\d*", text)
-    if len(items) != len(set(items)):
+    if has_duplicates(items):
         errors.append("Duplicate billing items detected")
         fraud_score += 25
 
@@ -90,21 +93,23 @@ uploaded_file = st.file_uploader(
     type=["png", "jpg", "jpeg", "pdf"]
 )
 
-if uploaded_file:
+quick_mode = st.checkbox("⚡ Quick mode (total only, skip validation)")
 
-    with tempfile.NamedTemporaryFile(delete=False) as temp:
-        temp.write(uploaded_file.read())
-        temp_path = temp.name
+if uploaded_file:
 
     st.info("Processing Bill...")
 
-    if uploaded_file.name.endswith(".pdf"):
-        text = extract_text_from_pdf(temp_path)
-    else:
-        text = extract_text_from_image(temp_path)
+    text = extract_text(uploaded_file.getvalue(), uploaded_file.name.endswith(".pdf"))
 
-    extracted_data = extract_key_details(text)
-    validation_errors, fraud_score = validate_bill(extracted_data, text)
+    # Most bills only need the total; extract_total reads bottom-up and stops
+    # at the first hit, so skip field, item and validation work entirely
+    if quick_mode:
+        st.subheader("💰 Bill Total")
+        st.json({"total": extract_total(text)})
+        st.stop()
+
+    extracted_data, subtotal, items = parse_bill(text)
+    validation_errors, fraud_score = validate_bill(extracted_data, subtotal, items)
 
     st.subheader("📄 Extracted Data")
     st.json(extracted_data)
@@ -124,6 +129,4 @@ if uploaded_file:
     elif fraud_score < 70:
         st.warning("Medium Risk")
     else:
-        st.error("High Risk")
-
-    os.remove(temp_path)
\ No newline at end of file
+        st.error("High Risk")
\ No newline at end of file
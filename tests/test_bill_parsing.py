@@ -0,0 +1,126 @@
+import time
+import unittest
+
+from bill_parsing import extract_total, parse_bill
+
+# Expected values are what the original per-field re.search / re.findall
+# calls returned for the same text, unless a case says otherwise
+
+STANDARD_BILL = (
+    "City Care Hospital\n"
+    "Hospital Name: City Care\n"
+    "Patient Name: John Doe\n"
+    "Date: 12/03/2024\n"
+    "1 Xray 500\n"
+    "2 Blood Test 300\n"
+    "Sub Total: 800\n"
+    "GST: 144\n"
+    "Grand Total: 944\n"
+)
+
+GST_AFTER_QUANTITY_BILL = (
+    "Patient Name: Asha Rao\n"
+    "Hospital Name: Apollo\n"
+    "Date: 05/06/2024\n"
+    "2 Dressing 150\n"
+    "18 GST 90\n"
+    "Total: 240\n"
+)
+
+SHARED_LINE_BILL = (
+    "Patient Name: John Doe   Date: 12/01/2024\n"
+    "Hospital Name: Apollo\n"
+    "1 Consultation 700\n"
+    "1 Consultation 700\n"
+    "Total: 1400\n"
+)
+
+
+class ParseBillTest(unittest.TestCase):
+
+    def test_standard_bill(self):
+        details, subtotal, items = parse_bill(STANDARD_BILL)
+        self.assertEqual(details["patient_name"], "John Doe")
+        self.assertEqual(details["hospital_name"], "City Care")
+        self.assertEqual(details["date"], "12/03/2024")
+        self.assertEqual(details["gst"], 144.0)
+        self.assertEqual(subtotal, 800.0)
+        self.assertEqual(items, ["1 Xray 500", "2 Blood Test 300"])
+
+    def test_gst_line_is_also_an_item(self):
+        details, subtotal, items = parse_bill(GST_AFTER_QUANTITY_BILL)
+        self.assertEqual(details["gst"], 90.0)
+        self.assertIsNone(subtotal)
+        self.assertEqual(items, ["2 Dressing 150", "18 GST 90"])
+
+    def test_labels_sharing_a_line(self):
+        details, subtotal, items = parse_bill(SHARED_LINE_BILL)
+        # The original patient value ran on to the end of the line and
+        # included "Date: 12/01/2024"; it now stops at the next label
+        self.assertEqual(details["patient_name"], "John Doe")
+        self.assertEqual(details["date"], "12/01/2024")
+        self.assertEqual(details["hospital_name"], "Apollo")
+        self.assertEqual(details["gst"], 0)
+        self.assertEqual(items, ["1 Consultation 700", "1 Consultation 700"])
+
+    def test_empty_label_does_not_take_next_line(self):
+        details, _, _ = parse_bill("Patient Name:\nHospital Name: Apollo\n")
+        self.assertEqual(details["patient_name"], "")
+        self.assertEqual(details["hospital_name"], "Apollo")
+
+    def test_long_whitespace_and_digit_runs_parse_quickly(self):
+        text = "1" + " " * 1500 + "a" + " " * 1500 + "x\n" + "1" * 20000 + "\nTotal" + " " * 20000 + "x"
+        start = time.perf_counter()
+        parse_bill(text)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_missing_fields(self):
+        details, subtotal, items = parse_bill("Thank you for visiting\n")
+        self.assertEqual(details["patient_name"], "Not Found")
+        self.assertEqual(details["hospital_name"], "Not Found")
+        self.assertEqual(details["date"], "Not Found")
+        self.assertEqual(details["gst"], 0)
+        self.assertEqual(details["total"], 0)
+        self.assertIsNone(subtotal)
+        self.assertEqual(items, [])
+
+
+class ExtractTotalTest(unittest.TestCase):
+
+    def test_grand_total_not_subtotal(self):
+        # The original search returned the "Sub Total" amount here
+        self.assertEqual(extract_total(STANDARD_BILL), 944.0)
+
+    def test_last_total_line_wins(self):
+        self.assertEqual(extract_total(GST_AFTER_QUANTITY_BILL), 240.0)
+
+    def test_subtotal_spellings_are_skipped(self):
+        for line in ["Sub Total: 1000", "Sub  Total: 1000", "Sub. Total: 1000",
+                     "Sub-Total 1000", "SUBTOTAL 1000", "sub\ttotal 1000"]:
+            self.assertEqual(extract_total(f"Total: 1180\n{line}\n"), 1180.0, line)
+
+    def test_grand_total_outranks_later_bare_total(self):
+        self.assertEqual(extract_total("Grand Total: 944\nTotal 2 items"), 944.0)
+
+    def test_grand_total_outranks_earlier_total_on_same_line(self):
+        self.assertEqual(extract_total("Total: 100 Grand Total: 944"), 944.0)
+
+    def test_label_priority(self):
+        self.assertEqual(extract_total("Net Total: 900\nTotal Amount: 950\nTotal: 1000"), 900.0)
+        self.assertEqual(extract_total("Total Amount: 950\nTotal: 1000"), 950.0)
+
+    def test_merged_ocr_tokens(self):
+        # The original search matched these; a leading \b must not drop them
+        self.assertEqual(extract_total("GrandTotal: 944"), 944.0)
+        self.assertEqual(extract_total("NetTotal 500"), 500.0)
+
+    def test_only_bottom_total_lines_are_ranked(self):
+        text = "Grand Total: 10\nTotal: 1\nTotal: 2\nTotal: 3\n"
+        self.assertEqual(extract_total(text), 3.0)
+
+    def test_total_after_subtotal_on_same_line(self):
+        self.assertEqual(extract_total("Sub Total: 1000  Grand Total: 1180"), 1180.0)
+
+
+if __name__ == "__main__":
+    unittest.main()